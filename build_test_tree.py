@@ -2,65 +2,408 @@
 # Copyright 2017-2019 DMTF. All rights reserved.
 # License: BSD 3-Clause License. For full text see link: https://github.com/DMTF/Redfish-Test-Framework/blob/main/LICENSE.md
 
-import argparse
-import io
+import concurrent.futures
+import contextlib
 import os
+import random
 import requests
+import shutil
+import subprocess
+import tarfile
+import tempfile
+import threading
+import urllib.parse
 import zipfile
 import sys
+import time
+from requests.adapters import HTTPAdapter
 
+# optional: ISA-L provides a zlib-compatible module with much faster SIMD inflate and CRC-32
+try:
+    from isal import isal_zlib
+except ImportError:
+    isal_zlib = None
 
-def download_zip(subdir, zip_url):
-    print('Extracting {} into {}'.format(zip_url, subdir if subdir is not None else '$PWD'))
+# chunk size used when streaming archives to disk
+CHUNK_SIZE = 64 * 1024
 
-    # Create subdirectory if specified
-    if subdir is not None:
-        try:
-            subdir = os.path.abspath(subdir)
-            if not os.path.isdir(subdir):
-                os.mkdir(subdir)
-        except OSError as e:
-            print("Error creating target subdirectory {}, error: {}".format(subdir, e), file=sys.stderr)
-            return
-    else:
-        subdir = os.getcwd()
+# buffer size used when writing extracted files
+COPY_BUFFER_SIZE = 1024 * 1024
+
+# characters not allowed in Windows file names, mapped to '_' when extracting (as zipfile does)
+WINDOWS_ILLEGAL_NAME_TRANS = str.maketrans(':<>|"?*', '_' * 7)
+
+# the tool archives to fetch and the subdirectory to extract each into (None for the current directory)
+DOWNLOAD_LIST = (
+    ('Schema-Validation', 'https://github.com/DMTF/Redfish-Service-Validator/archive/main.zip'),
+    ('Other-Tests', 'https://github.com/DMTF/Redfish-Reference-Checker/archive/main.zip'),
+    ('Other-Tests', 'https://github.com/DMTF/Redfish-Mockup-Creator/archive/main.zip'),
+    ('Profile-Validation', 'https://github.com/DMTF/Redfish-Interop-Validator/archive/main.zip'),
+    ('Protocol-Validation', 'https://github.com/DMTF/Redfish-Protocol-Validator/archive/main.zip'),
+    (None, 'https://github.com/DMTF/Redfish-Usecase-Checkers/archive/main.zip')
+)
+
+# top-level directories of the tool repositories that the test framework does not use
+SKIPPED_DIRS = ('.github', 'docs', 'tests')
+
+# (connect, read) timeouts in seconds for archive requests
+REQUEST_TIMEOUT = (5, 30)
+
+# number of attempts to fetch an archive and the base delay in seconds between them
+FETCH_ATTEMPTS = 4
+FETCH_BACKOFF = 0.3
 
-    # Fetch zip
+# extractions currently using ISA-L in zipfile (see use_isal_in_zipfile())
+_isal_lock = threading.Lock()
+_isal_users = 0
+_zipfile_zlib = zipfile.zlib
+_zipfile_crc32 = zipfile.crc32
+
+
+@contextlib.contextmanager
+def use_isal_in_zipfile():
+    """
+    Make zipfile inflate and check archive members with ISA-L (if installed) while the context is active
+
+    zipfile has no API to choose these, so this relies on CPython internals: zipfile looks up its module globals
+    zlib (in _get_decompressor()) and crc32 (in ZipExtFile._update_crc()) on each call. They are swapped for ISA-L's
+    while any extraction is using them, and restored when the last one finishes.
+    """
+    global _isal_users
+    if isal_zlib is None:
+        yield
+        return
+    with _isal_lock:
+        if _isal_users == 0:
+            zipfile.zlib = isal_zlib
+            zipfile.crc32 = isal_zlib.crc32
+        _isal_users += 1
     try:
-        r = requests.get(zip_url, stream=True)
-        if r.status_code != requests.codes.ok:
-            print("Unable to retrieve zip at {}. Status = {}, response = {}".format(zip_url, r.status_code, r.text),
-                  file=sys.stderr)
-            return
-    except Exception as e:
-        print('Unable to retrieve zip at {}. Exception is "{}"'.format(zip_url, e), file=sys.stderr)
+        yield
+    finally:
+        with _isal_lock:
+            _isal_users -= 1
+            if _isal_users == 0:
+                zipfile.zlib = _zipfile_zlib
+                zipfile.crc32 = _zipfile_crc32
+
+
+def create_session():
+    """
+    Create the session shared by the downloads, so they reuse pooled keep-alive connections to GitHub
+
+    :return: the session
+    """
+    session = requests.Session()
+    # failed requests are retried by download_zip(), so the adapter does not retry them as well
+    adapter = HTTPAdapter(pool_connections=8, pool_maxsize=8)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def get_archive_name(zip_url):
+    """
+    Get the name of the repository an archive URL refers to (e.g. 'Redfish-Service-Validator')
+
+    :param zip_url: the URL of the zip archive
+    :return: the repository name
+    """
+    return urllib.parse.urlsplit(zip_url).path.strip('/').split('/')[1]
+
+
+def get_archive_root(z):
+    """
+    Get the top-level directory all the members of an archive are under
+
+    :param z: the open ZipFile
+    :return: the name of the top-level directory, or '' if there is not a single one
+    """
+    roots = {name.split('/', 1)[0] for name in z.namelist()}
+    return roots.pop() if len(roots) == 1 else ''
+
+
+def read_etag(etag_path, subdir):
+    """
+    Read the ETag saved from a previous extraction of an archive
+
+    :param etag_path: the path of the ETag file
+    :param subdir: the directory the archive was extracted into
+    :return: the ETag if present and the extracted tree still exists, otherwise None
+    """
+    try:
+        with open(etag_path) as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return None
+    if len(lines) != 2 or not os.path.isdir(os.path.join(subdir, lines[1])):
+        return None
+    return lines[0]
+
+
+def write_etag(etag_path, etag, root):
+    """
+    Atomically save the ETag of an extracted archive along with the top-level directory it was extracted to
+
+    :param etag_path: the path of the ETag file
+    :param etag: the ETag of the archive
+    :param root: the top-level directory of the archive
+    """
+    tmp_path = etag_path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        f.write('{}\n{}\n'.format(etag, root))
+    os.replace(tmp_path, etag_path)
+
+
+def get_member_path(subdir, filename):
+    """
+    Get the path to extract an archive member to, dropping any drive, absolute or '..' components like zipfile does.
+    On Windows, characters not allowed in file names are replaced with '_' and trailing dots are removed, also like
+    zipfile does.
+
+    :param subdir: the directory being extracted into
+    :param filename: the name of the member within the archive
+    :return: the target path for the member
+    """
+    arcname = filename.replace('/', os.path.sep)
+    if os.path.altsep:
+        arcname = arcname.replace(os.path.altsep, os.path.sep)
+    arcname = os.path.splitdrive(arcname)[1]
+    invalid_path_parts = ('', os.path.curdir, os.path.pardir)
+    arcname = os.path.sep.join(x for x in arcname.split(os.path.sep) if x not in invalid_path_parts)
+    if os.name == 'nt':
+        arcname = arcname.translate(WINDOWS_ILLEGAL_NAME_TRANS)
+        arcname = os.path.sep.join(x.rstrip('.') for x in arcname.split(os.path.sep) if x.rstrip('.'))
+    return os.path.join(subdir, arcname)
+
+
+def is_skipped_member(filename):
+    """
+    Check if an archive member is under one of the SKIPPED_DIRS in the archive's top-level directory
+
+    :param filename: the name of the member within the archive
+    :return: True if the member is not extracted
+    """
+    parts = filename.split('/', 2)
+    return len(parts) > 1 and parts[1] in SKIPPED_DIRS
+
+
+def get_skipped_patterns(z):
+    """
+    Get the paths of the SKIPPED_DIRS in an archive, for excluding them when extracting with bsdtar
+
+    :param z: the open ZipFile
+    :return: the list of paths (bsdtar also excludes everything under an excluded directory)
+    """
+    roots = sorted({name.split('/', 1)[0] for name in z.namelist()})
+    return ['{}/{}'.format(root, skipped_dir) for root in roots for skipped_dir in SKIPPED_DIRS]
+
+
+def extract_member(z, info, path):
+    """
+    Extract a single file member of an archive (its directory must already exist)
+
+    :param z: the open ZipFile
+    :param info: the ZipInfo of the member to extract
+    :param path: the path to extract the member to
+    """
+    # unbuffered, so each chunk read from the archive is written with a single write()
+    with z.open(info) as src, open(path, 'wb', buffering=0) as dst:
+        shutil.copyfileobj(src, dst, COPY_BUFFER_SIZE)
+
+
+def extract_zip(z, subdir):
+    """
+    Extract the members of a zip archive, decompressing the files in parallel. Members under SKIPPED_DIRS in the
+    archive's top-level directory are not extracted.
+
+    :param z: the open ZipFile
+    :param subdir: the directory to extract into
+    """
+    # Create the whole directory tree in one pass, so extracting a file is just open() and write()
+    dirs = set()
+    files = []
+    for info in z.infolist():
+        if is_skipped_member(info.filename):
+            continue
+        path = get_member_path(subdir, info.filename)
+        # ZipInfo.is_dir() needs Python 3.6; directory members are the names ending with '/'
+        if info.filename.endswith('/'):
+            dirs.add(path)
+        else:
+            dirs.add(os.path.dirname(path))
+            files.append((info, path))
+    for path in sorted(dirs, key=len):
+        os.makedirs(path, exist_ok=True)
+    # ZipFile only serializes the raw reads; inflate, CRC and writes run concurrently
+    with use_isal_in_zipfile(), concurrent.futures.ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+        list(executor.map(lambda file: extract_member(z, *file), files))
+
+
+def download_zip(session, subdir, zip_url, archive_name):
+    """
+    Fetch a zip archive and extract it
+
+    :param session: the session to fetch with (see create_session())
+    :param subdir: the full path of the existing directory to extract into
+    :param zip_url: the URL of the zip archive
+    :param archive_name: the name of the repository the archive is for (see get_archive_name())
+    """
+    print('Extracting {} into {}'.format(zip_url, subdir))
+
+    # Fetch zip (conditionally if we have the ETag from a previous download)
+    etag_path = os.path.join(subdir, '.etag_' + archive_name)
+    etag = read_etag(etag_path, subdir)
+    headers = {'If-None-Match': etag} if etag is not None else {}
+    # Retry connection errors and server errors with jittered exponential backoff
+    for attempt in range(FETCH_ATTEMPTS):
+        if attempt > 0:
+            time.sleep(FETCH_BACKOFF * (2 ** (attempt - 1)) + random.random() * 0.1)
+        try:
+            r = session.get(zip_url, stream=True, headers=headers, timeout=REQUEST_TIMEOUT)
+        except requests.RequestException as e:
+            error = 'Exception is "{}"'.format(e)
+            continue
+        if r.status_code < 500:
+            break
+        error = 'Status = {}, response = {}'.format(r.status_code, r.text)
+        r.close()
+    else:
+        print('Unable to retrieve zip at {}. {}'.format(zip_url, error), file=sys.stderr)
+        return
+    # a server ignoring If-None-Match can return the same archive again
+    if r.status_code == requests.codes.not_modified or (etag is not None and r.headers.get('ETag') == etag):
+        print('Archive at {} is unchanged, skipping'.format(zip_url))
+        r.close()
+        return
+    if r.status_code != requests.codes.ok:
+        print("Unable to retrieve zip at {}. Status = {}, response = {}".format(zip_url, r.status_code, r.text),
+              file=sys.stderr)
         return
 
-    # Extract zip
+    # Stream zip to a temporary file and extract it
     try:
-        z = zipfile.ZipFile(io.BytesIO(r.content), mode='r')
-        z.extractall(path=subdir)
+        with tempfile.TemporaryFile() as tmp:
+            for chunk in r.iter_content(chunk_size=CHUNK_SIZE):
+                tmp.write(chunk)
+            tmp.seek(0)
+            with zipfile.ZipFile(tmp, mode='r') as z:
+                extract_zip(z, subdir)
+                root = get_archive_root(z)
+        # Save the ETag so the next run can skip an unchanged archive
+        etag = r.headers.get('ETag')
+        if etag is not None:
+            write_etag(etag_path, etag, root)
     except Exception as e:
         print('Unable to extract zip from {}. Exception is "{}"'.format(zip_url, e), file=sys.stderr)
         return
+    finally:
+        r.close()
+
+
+def extract_with_tar(zip_path, subdir):
+    """
+    Extract a zip archive by streaming it as a tar archive into the system tar (for tars that cannot read zip).
+    Members under SKIPPED_DIRS in the archive's top-level directory are not extracted.
+
+    :param zip_path: the path of the zip archive
+    :param subdir: the directory to extract into
+    """
+    tar_proc = subprocess.Popen(['tar', '-xf', '-', '-C', subdir], stdin=subprocess.PIPE)
+    try:
+        with zipfile.ZipFile(zip_path) as z, tarfile.open(fileobj=tar_proc.stdin, mode='w|') as tar:
+            with use_isal_in_zipfile():
+                for info in z.infolist():
+                    if is_skipped_member(info.filename):
+                        continue
+                    tar_info = tarfile.TarInfo(info.filename)
+                    tar_info.mtime = time.mktime(info.date_time + (0, 0, -1))
+                    tar_info.mode = (info.external_attr >> 16) & 0o777
+                    if info.filename.endswith('/'):
+                        tar_info.type = tarfile.DIRTYPE
+                        tar_info.mode = tar_info.mode or 0o755
+                        tar.addfile(tar_info)
+                    else:
+                        tar_info.size = info.file_size
+                        tar_info.mode = tar_info.mode or 0o644
+                        with z.open(info) as src:
+                            tar.addfile(tar_info, src)
+    finally:
+        tar_proc.stdin.close()
+        tar_proc.wait()
+    if tar_proc.returncode != 0:
+        raise subprocess.CalledProcessError(tar_proc.returncode, tar_proc.args)
+
+
+def download_with_curl(download_list):
+    """
+    Fetch all the archives with a single parallel curl invocation and extract them with bsdtar (or, if bsdtar is not
+    installed, by streaming them through tar)
+
+    :param download_list: list of (subdir, zip_url, archive_name) entries, where subdir is the full path of an
+        existing directory
+    :return: True if all the archives were fetched and extracted, otherwise False
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        curl_args = ['curl', '--fail', '--no-progress-meter', '--location',
+                     '--parallel', '--parallel-immediate', '--parallel-max', str(len(download_list))]
+        archives = []
+        for index, (subdir, zip_url, _) in enumerate(download_list):
+            print('Extracting {} into {}'.format(zip_url, subdir))
+            zip_path = os.path.join(tmp_dir, '{}.zip'.format(index))
+            curl_args += ['-o', zip_path, zip_url]
+            archives.append((subdir, zip_path))
+        use_bsdtar = shutil.which('bsdtar') is not None
+        try:
+            subprocess.run(curl_args, check=True)
+            for subdir, zip_path in archives:
+                if use_bsdtar:
+                    with zipfile.ZipFile(zip_path) as z:
+                        excludes = ['--exclude={}'.format(pattern) for pattern in get_skipped_patterns(z)]
+                    subprocess.run(['bsdtar', '-xf', zip_path, '-C', subdir] + excludes, check=True)
+                else:
+                    extract_with_tar(zip_path, subdir)
+        except (OSError, zipfile.BadZipFile, subprocess.CalledProcessError) as e:
+            print('Unable to fetch and extract archives with curl, error: {}'.format(e), file=sys.stderr)
+            return False
+    return True
 
 
 def main():
-    arg_parser = argparse.ArgumentParser(
-        description='Fetch Redfish tools and build test framework tree in current working directory')
-    arg_parser.parse_args()
-
-    download_list = [
-        ['Schema-Validation', 'https://github.com/DMTF/Redfish-Service-Validator/archive/main.zip'],
-        ['Other-Tests', 'https://github.com/DMTF/Redfish-Reference-Checker/archive/main.zip'],
-        ['Other-Tests', 'https://github.com/DMTF/Redfish-Mockup-Creator/archive/main.zip'],
-        ['Profile-Validation', 'https://github.com/DMTF/Redfish-Interop-Validator/archive/main.zip'],
-        ['Protocol-Validation', 'https://github.com/DMTF/Redfish-Protocol-Validator/archive/main.zip'],
-        [None, 'https://github.com/DMTF/Redfish-Usecase-Checkers/archive/main.zip']
-    ]
-
-    for subdir, zip_url in download_list:
-        download_zip(subdir, zip_url)
+    # Only import and build the arg parser when there are args to parse (the common case is none)
+    use_curl = False
+    if len(sys.argv) > 1:
+        import argparse
+        arg_parser = argparse.ArgumentParser(
+            description='Fetch Redfish tools and build test framework tree in current working directory')
+        arg_parser.add_argument('--curl', action='store_true',
+                                help='fetch the tools with curl and extract them with bsdtar or tar (if installed)')
+        use_curl = arg_parser.parse_args().curl
+
+    # Build the fetch plan up front: resolve the target directories (creating each only once, so the concurrent
+    # downloads never race to create them) and the repository name used to track each archive's ETag
+    download_list = []
+    for subdir, zip_url in DOWNLOAD_LIST:
+        subdir = os.path.abspath(subdir) if subdir is not None else os.getcwd()
+        download_list.append((subdir, zip_url, get_archive_name(zip_url)))
+    for subdir in sorted({entry[0] for entry in download_list}):
+        try:
+            os.makedirs(subdir, exist_ok=True)
+        except OSError as e:
+            print("Error creating target subdirectory {}, error: {}".format(subdir, e), file=sys.stderr)
+            download_list = [entry for entry in download_list if entry[0] != subdir]
+
+    if use_curl:
+        if shutil.which('curl') is not None and (shutil.which('bsdtar') is not None or shutil.which('tar') is not None):
+            if download_with_curl(download_list):
+                return
+        else:
+            print('curl and tar are required for --curl, falling back to built-in download', file=sys.stderr)
+
+    # Downloads are independent and network bound, so fetch them concurrently (over one shared session)
+    session = create_session()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=len(download_list)) as executor:
+        list(executor.map(lambda entry: download_zip(session, *entry), download_list))
 
 
 if __name__ == "__main__":
@@ -2,22 +2,41 @@
 # Copyright 2017-2019 DMTF. All rights reserved.
 # License: BSD 3-Clause License. For full text see link: https://github.com/DMTF/Redfish-Test-Framework/blob/main/LICENSE.md
 
-import argparse
+import concurrent.futures
 import datetime
-import HtmlTestRunner
+import functools
 import json
-import jsonschema
 import logging
 import os
 import re
 import subprocess
 import sys
+import threading
 import time
+import types
 import unittest
 
+# optional: orjson parses and serializes JSON several times faster than the json module
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # for NOTICE logging level (25 is between INFO and WARNING)
 NOTICE = 25
 
+# format of the timestamps in the results files
+TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+
+# all timestamps are in UTC
+_UTC = datetime.timezone.utc
+
+# sentinel for variable lookups that find no value
+_MISSING = object()
+
+# matches the chars to replace with '_' to make a valid python identifier
+_SANITIZE_IDENT = re.compile(r'\W|^(?=\d)')
+
 
 class TestFramework(object):
     """
@@ -29,7 +48,7 @@ class TestFramework(object):
     config_filename = "framework_conf.json"
 
     # sensitive config args like password that should not be logged or printed
-    sensitive_args = ["password", "token"]
+    sensitive_args = frozenset(["password", "token"])
 
     # schema for TestFramework config file (framework_conf.json)
     config_schema = {
@@ -95,7 +114,7 @@ class TestFramework(object):
         self.suite_list = list()
         self.suite_dict = dict()
         self.config_vars = dict()
-        self.timestamp = datetime.datetime.now(datetime.timezone.utc)
+        self.timestamp = datetime.datetime.now(_UTC)
         self.output_subdir = "output-{:%Y-%m-%dT%H%M%SZ}".format(self.timestamp)
 
     def get_path(self):
@@ -110,6 +129,16 @@ class TestFramework(object):
         """
         return self.timestamp
 
+    def set_config(self, config_file, config_dict):
+        """
+        Set the config file and the config data read from it in one call
+
+        :param config_file: filename of the top-level config file (not including the path)
+        :param config_dict: dictionary of the config data read from the top-level config file
+        """
+        self.config_file = config_file
+        self.set_config_data(config_dict)
+
     def set_config_file(self, config_file):
         """
         :param config_file: filename of the top-level config file (not including the path)
@@ -141,11 +170,11 @@ class TestFramework(object):
             for var in variables:
                 self.config_vars[var] = variables[var]
         # do not log config_vars by default (even in debug mode) - may contain sensitive vars like password
-        # logging.debug("set_config_data: config_vars = {}".format(self.config_vars))
+        # logging.debug("set_config_data: config_vars = %s", self.config_vars)
 
     def override_config_data(self, args):
         """
-        :param args: Namespace of command-line args (from argparse)
+        :param args: Namespace of command-line args (from parse_args_fast() or argparse)
         """
         if args.rhost is not None:
             self.config_vars["target_system"] = args.rhost
@@ -170,37 +199,13 @@ class TestFramework(object):
             self.config_vars["base_url"] = (self.config_vars["scheme"] + '://'
                                             + self.config_vars["target_system"])
         # do not log config_vars by default (even in debug mode) - may contain sensitive vars like password
-        # logging.debug("override_config_data: config_vars = {}".format(self.config_vars))
+        # logging.debug("override_config_data: config_vars = %s", self.config_vars)
 
-    def substitute_config_variables(self, command_args, command_args_printable):
+    def get_variable_level(self):
         """
-        Perform variable substitution on the test-case-level command-line args
-        using variables defined in the top-level configuration
-        
-        :param command_args: test-case command-line args
-        :param command_args_printable: test-case command-line args with sensitive args like password obscured
+        :return: the top-level variables as a level for substitute_variables()
         """
-        if command_args is not None:
-            for index, arg in enumerate(command_args):
-                if arg.startswith("$"):
-                    var = arg[1:]
-                    if var in self.config_vars:
-                        command_args[index] = self.config_vars[var]
-                    else:
-                        logging.warning("No variable for arg {} found".format(arg))
-        if command_args_printable is not None:
-            for index, arg in enumerate(command_args_printable):
-                if arg.startswith("$"):
-                    var = arg[1:]
-                    if var in self.config_vars:
-                        # mask sensitive args like password
-                        if var not in TestFramework.sensitive_args:
-                            command_args_printable[index] = self.config_vars[var]
-                        else:
-                            command_args_printable[index] = "********"
-                    else:
-                        logging.warning("No variable for arg {} found".format(arg))
-            logging.debug("printable command args after top-level substitution: {}".format(command_args_printable))
+        return self.config_vars, logging.WARNING, "No variable for arg %s found"
 
     def get_config_data(self):
         """
@@ -291,6 +296,16 @@ class TestSuite(object):
         """
         return self.path
 
+    def set_config(self, config_file, config_dict):
+        """
+        Set the config file and the config data read from it in one call
+
+        :param config_file: filename of the config file for this suite (not including the path)
+        :param config_dict: dictionary of the config data read from the config file for this suite
+        """
+        self.config_file = config_file
+        self.set_config_data(config_dict)
+
     def set_config_file(self, config_file):
         """
         :param config_file: filename of the config file for this suite (not including the path)
@@ -313,37 +328,13 @@ class TestSuite(object):
             for var in variables:
                 self.custom_vars[var] = variables[var]
         # do not log config_vars by default (even in debug mode) - may contain sensitive vars like password
-        # logging.debug("set_config_data: custom_vars = {}".format(self.custom_vars))
+        # logging.debug("set_config_data: custom_vars = %s", self.custom_vars)
 
-    def substitute_config_variables(self, command_args, command_args_printable):
+    def get_variable_level(self):
         """
-        Perform variable substitution on the test-case command line args
-        using variables defined in the suite-level configuration
-
-        :param command_args: test-case command args
-        :param command_args_printable: test-case command-line args with sensitive args like password obscured
+        :return: the suite-level variables as a level for substitute_variables()
         """
-        if command_args is not None:
-            for index, arg in enumerate(command_args):
-                if arg.startswith("$"):
-                    var = arg[1:]
-                    if var in self.custom_vars:
-                        command_args[index] = self.custom_vars[var]
-                    else:
-                        logging.debug("No custom variable for arg {} found".format(arg))
-        if command_args_printable is not None:
-            for index, arg in enumerate(command_args_printable):
-                if arg.startswith("$"):
-                    var = arg[1:]
-                    if var in self.custom_vars:
-                        # mask sensitive args like password
-                        if var not in TestFramework.sensitive_args:
-                            command_args_printable[index] = self.custom_vars[var]
-                        else:
-                            command_args_printable[index] = "********"
-                    else:
-                        logging.debug("No custom variable for arg {} found".format(arg))
-            logging.debug("printable command args after suite-level substitution: {}".format(command_args_printable))
+        return self.custom_vars, logging.DEBUG, "No custom variable for arg %s found"
 
     def get_config_data(self):
         """
@@ -442,7 +433,9 @@ class TestCase(object):
         self.results_filename = "results.json"
         self.results = None
         self.timestamp = None
+        self.timestamp_str = None
         self.wait_seconds_after = 0
+        self.ran = False
 
     def get_path(self):
         """
@@ -470,10 +463,17 @@ class TestCase(object):
         test_case = self.config_dict["test"]
         if "command" in test_case:
             self.command_args = test_case["command"].split()
-            self.command_args_printable = test_case["command"].split()
+            self.command_args_printable = list(self.command_args)
         if "wait_seconds_after" in test_case:
             self.wait_seconds_after = test_case["wait_seconds_after"]
 
+    def load_config_data(self):
+        """
+        Read the config file for this test case (if set); called for all test cases by load_all_config_data()
+        """
+        if self.config_file is not None:
+            self.set_config_data(read_config_file(self.path, self.config_file))
+
     def get_command_args(self):
         """
         :return: the command line args for this test case
@@ -510,21 +510,30 @@ class TestCase(object):
         """
         return self.timestamp
 
+    def get_timestamp_str(self):
+        """
+        :return: the timestamp when this test was run, formatted for the results files
+        """
+        if self.timestamp_str is None and self.timestamp is not None:
+            self.timestamp_str = self.timestamp.strftime(TIMESTAMP_FORMAT)
+        return self.timestamp_str
+
+    def has_run(self):
+        """
+        :return: True if this test case has already been run
+        """
+        return self.ran
+
     def run(self):
         """
         Runs this test case
         """
-        # Change to the directory containing the test case
-        try:
-            os.chdir(self.path)
-        except OSError as e:
-            logging.error("Unable to change directory to {}, error: {}".format(self.path, e))
-            return
+        self.ran = True
         # Create output directory (should NOT already exist)
         try:
             os.mkdir(self.output_dir)
         except OSError as e:
-            logging.error("Unable to create output directory {}, error: {}".format(self.output_dir, e))
+            logging.error("Unable to create output directory %s, error: %s", self.output_dir, e)
             return
         # Open output files for STDOUT and STDERR
         try:
@@ -533,74 +542,72 @@ class TestCase(object):
             std_err_path = os.path.join(self.output_dir, "stderr.log")
             std_err_fd = open(std_err_path, "w")
         except OSError as e:
-            logging.error("Unable to create output file in directory {}, error: {}".format(self.output_dir, e))
+            logging.error("Unable to create output file in directory %s, error: %s", self.output_dir, e)
             return
         # Run test
         if self.config_dict is not None and "test" in self.config_dict:
             test_case = self.config_dict["test"]
             if self.command_args is not None:
                 try:
-                    logging.info("Running test in {}".format(self.name))
-                    self.timestamp = datetime.datetime.now(datetime.timezone.utc)
-                    self.return_code = subprocess.call(self.command_args, stdout=std_out_fd, stderr=std_err_fd)
-                    msg = "Return code {} from running test in {}".format(self.return_code, self.path)
-                    if self.return_code == 0:
-                        logging.info(msg)
-                    else:
-                        logging.error(msg)
+                    logging.info("Running test in %s", self.name)
+                    self.timestamp = datetime.datetime.now(_UTC)
+                    # run in the test case directory (without changing the process-wide working directory)
+                    self.return_code = subprocess.call(self.command_args, stdout=std_out_fd, stderr=std_err_fd,
+                                                       cwd=self.path)
+                    logging.log(logging.INFO if self.return_code == 0 else logging.ERROR,
+                                "Return code %s from running test in %s", self.return_code, self.path)
                 except OSError as e:
-                    logging.error("OSError while trying to execute test in {}, error: {}".format(self.path, e))
+                    logging.error("OSError while trying to execute test in %s, error: %s", self.path, e)
                 except ValueError as e:
-                    logging.error("ValueError while trying to execute test in {}, error: {}".format(self.path, e))
+                    logging.error("ValueError while trying to execute test in %s, error: %s", self.path, e)
                 except subprocess.TimeoutExpired as e:
-                    logging.error("TimeoutExpired while trying to execute test in {}, error: {}".format(self.path, e))
+                    logging.error("TimeoutExpired while trying to execute test in %s, error: %s", self.path, e)
                 else:
                     pass
                 # Read the results.json file if available
                 try:
-                    results_filename = os.path.join(self.output_dir, self.results_filename)
-                    if os.path.isfile(results_filename):
-                        with open(results_filename) as results_file:
-                            self.results = json.load(results_file)
-                    else:
-                        # Not all tests create results.json; just log debug msg
-                        logging.debug("No 'results.json' file found for test '{}'".format(self.name))
+                    self.results = read_json_file(os.path.join(self.output_dir, self.results_filename))
+                except FileNotFoundError:
+                    # Not all tests create results.json; just log debug msg
+                    logging.debug("No 'results.json' file found for test '%s'", self.name)
                 except OSError as e:
-                    logging.error("OSError opening JSON results from file {} in directory {}, error: {}"
-                                    .format(self.results_filename, self.output_dir, e))
+                    logging.error("OSError opening JSON results from file %s in directory %s, error: %s",
+                                  self.results_filename, self.output_dir, e)
                 except ValueError as e:
-                    logging.error("ValueError loading JSON results from file {} in directory {}, error: {}"
-                                  .format(self.results_filename, self.output_dir, e))
+                    logging.error("ValueError loading JSON results from file %s in directory %s, error: %s",
+                                  self.results_filename, self.output_dir, e)
                 else:
                     pass
             else:
-                logging.warning("Skipping test in {}: element 'command' missing from 'test' element {}"
-                                .format(self.name, test_case))
+                logging.warning("Skipping test in %s: element 'command' missing from 'test' element %s",
+                                self.name, test_case)
         else:
-            logging.warning("Skipping {}: test config data empty or 'test' element missing. Test config data: {}"
-                            .format(self.name, self.config_dict))
+            logging.warning("Skipping %s: test config data empty or 'test' element missing. Test config data: %s",
+                            self.name, self.config_dict)
         # Close output files
         std_out_fd.close()
         std_err_fd.close()
         # sleep if wait_seconds_after param provided
         if self.wait_seconds_after > 0:
-            msg = "Sleeping for {} seconds after running test".format(self.wait_seconds_after)
-            logging.log(NOTICE, msg)
+            logging.log(NOTICE, "Sleeping for %s seconds after running test", self.wait_seconds_after)
             time.sleep(self.wait_seconds_after)
 
 
 class RedfishTestCase(unittest.TestCase):
     """
     A unittest TestCase class to drive running the Redfish tests through the Python unittest framework.
-    Note that there are no "test*" methods defined in this class. They are added dynamically via the
-    add_test_as_unittest() function as the tests to be run are discovered and set up.
+    Note that there are no "test*" methods defined in this class. They are created via the add_test_as_unittest()
+    function as the tests to be run are discovered and set up, and added to a subclass built by
+    create_test_class().
 
     Each of the dynamically created "test*" methods can be viewed as a stub that calls the run_test()
     method below to actually run the test, collect the results and assert that it passed.
     """
 
     def run_test(self, framework, suite, case, results):
-        case.run()
+        # the case may already have been run in parallel by run_all()
+        if not case.has_run():
+            case.run()
         rc = case.get_return_code()
         if case.get_return_code() == 0:
             # add results object to summary passing results object
@@ -608,7 +615,7 @@ class RedfishTestCase(unittest.TestCase):
                 results.add_test_results_pass(case.get_results())
             else:
                 test_results = create_test_results(suite.get_name(), case.get_name(),
-                                                   case.get_timestamp(), case.get_command_args_printable(),
+                                                   case.get_timestamp_str(), case.get_command_args_printable(),
                                                    case.get_return_code())
                 results.add_test_results_pass(test_results)
         else:
@@ -617,14 +624,9 @@ class RedfishTestCase(unittest.TestCase):
                 results.add_test_results_fail(case.get_results())
             else:
                 test_results = create_test_results(suite.get_name(), case.get_name(),
-                                                   case.get_timestamp(), case.get_command_args_printable(),
+                                                   case.get_timestamp_str(), case.get_command_args_printable(),
                                                    case.get_return_code())
                 results.add_test_results_fail(test_results)
-        # change directory back to top-level
-        try:
-            os.chdir(framework.get_path())
-        except OSError as e:
-            logging.error("Unable to change directory to {}, error: {}".format(framework.get_path(), e))
         self.assertEqual(rc, 0, msg="Non-zero return code from test case")
 
 
@@ -635,10 +637,12 @@ class Results(object):
         self.results_pass_filename = "results_pass.json"
         self.results_fail_filename = "results_fail.json"
         self.return_code = 0
+        self.lock = threading.Lock()
+        timestamp_str = timestamp.strftime(TIMESTAMP_FORMAT)
         self.results_pass = {
             "Redfish Test Framework Passing Results": {
                 "Timestamp": {
-                    "DateTime": "{:%Y-%m-%dT%H:%M:%SZ}".format(timestamp)
+                    "DateTime": timestamp_str
                 }
             },
             "TestCases": []
@@ -646,17 +650,19 @@ class Results(object):
         self.results_fail = {
             "Redfish Test Framework Failing Results": {
                 "Timestamp": {
-                    "DateTime": "{:%Y-%m-%dT%H:%M:%SZ}".format(timestamp)
+                    "DateTime": timestamp_str
                 }
             },
             "TestCases": []
         }
 
     def add_test_results_pass(self, results_dict):
-        self.results_pass["TestCases"].append(results_dict)
+        with self.lock:
+            self.results_pass["TestCases"].append(results_dict)
 
     def add_test_results_fail(self, results_dict):
-        self.results_fail["TestCases"].append(results_dict)
+        with self.lock:
+            self.results_fail["TestCases"].append(results_dict)
 
     def write_results(self):
         # Create output dir if it doesn't exist
@@ -664,45 +670,162 @@ class Results(object):
             if not os.path.isdir(self.output_dir):
                 os.makedirs(self.output_dir)
         except OSError as e:
-            logging.error("Error creating output directory {}, error: {}".format(self.output_dir, e))
+            logging.error("Error creating output directory %s, error: %s", self.output_dir, e)
             logging.error("Will write results file to current working directory instead.")
             self.output_dir = os.getcwd()
         # Write the passing results file
         path = os.path.join(self.output_dir, self.results_pass_filename)
         try:
-            with open(path, 'w') as outfile:
-                json.dump(self.results_pass, outfile)
+            write_json_file(path, self.results_pass)
         except OSError as e:
-            logging.error("Error writing results file to {}, error: {}".format(path, e))
+            logging.error("Error writing results file to %s, error: %s", path, e)
             logging.error("Printing results to STDOUT instead.")
-            print(json.dumps(self.results_pass))
+            print(json_dumps(self.results_pass))
         # Write the failing results file
         path = os.path.join(self.output_dir, self.results_fail_filename)
         try:
-            with open(path, 'w') as outfile:
-                json.dump(self.results_fail, outfile)
+            write_json_file(path, self.results_fail)
         except OSError as e:
-            logging.error("Error writing results file to {}, error: {}".format(path, e))
+            logging.error("Error writing results file to %s, error: %s", path, e)
             logging.error("Printing results to STDOUT instead.")
-            print(json.dumps(self.results_fail))
+            print(json_dumps(self.results_fail))
+
+
+def substitute_arg(arg, levels, masked_vars):
+    """
+    Perform variable substitution on a single command-line arg (an arg of the form $name)
+
+    :param arg: the command-line arg
+    :param levels: sequence of (variables, missing_level, missing_msg) tuples applied in order, where variables is a
+        dictionary of variable names to values, and missing_level and missing_msg are the logging level and message
+        format for an arg that does not match a variable
+    :param masked_vars: names of the variables whose values are obscured (e.g. TestFramework.sensitive_args)
+    :return: the substituted arg
+    """
+    for variables, missing_level, missing_msg in levels:
+        if not arg.startswith("$"):
+            break
+        var = arg[1:]
+        value = variables.get(var, _MISSING)
+        if value is _MISSING:
+            logging.log(missing_level, missing_msg, arg)
+        elif var in masked_vars:
+            arg = "********"
+        else:
+            arg = value
+    return arg
+
+
+def substitute_variables(command_args, command_args_printable, levels):
+    """
+    Perform variable substitution on command-line args, walking the args and the printable args together in a
+    single pass
+
+    :param command_args: test-case command-line args (or None)
+    :param command_args_printable: test-case command-line args with sensitive args like password obscured (or None)
+    :param levels: sequence of (variables, missing_level, missing_msg) tuples (see substitute_arg())
+    """
+    if command_args is None and command_args_printable is None:
+        return
+    # bind the lookups used in the loop to locals
+    substitute = substitute_arg
+    sensitive_args = TestFramework.sensitive_args
+    for index in range(len(command_args if command_args is not None else command_args_printable)):
+        if command_args is not None:
+            arg = command_args[index]
+            if arg[:1] == "$":
+                command_args[index] = substitute(arg, levels, ())
+        if command_args_printable is not None:
+            arg = command_args_printable[index]
+            if arg[:1] == "$":
+                command_args_printable[index] = substitute(arg, levels, sensitive_args)
+
+
+def substitute_config_variables(framework, suite, command_args, command_args_printable):
+    """
+    Perform variable substitution on the test-case command-line args using the variables defined in the
+    suite-level configuration and then those defined in the top-level configuration, in a single pass
+
+    :param framework: the TestFramework instance
+    :param suite: the TestSuite instance
+    :param command_args: test-case command-line args
+    :param command_args_printable: test-case command-line args with sensitive args like password obscured
+    """
+    substitute_variables(command_args, command_args_printable, (suite.get_variable_level(),
+                                                                framework.get_variable_level()))
+    if command_args_printable is not None:
+        logging.debug("printable command args after substitution: %s", command_args_printable)
+
+
+def read_json_file(path):
+    """
+    Read a JSON file (using orjson if available) and load it into a python object
+
+    :param path: the full path of the file
+    :return: the python object representing the JSON file
+    """
+    if orjson is not None:
+        with open(path, 'rb') as json_data:
+            return orjson.loads(json_data.read())
+    with open(path) as json_data:
+        return json.load(json_data)
+
+
+def json_dumps(obj):
+    """
+    Serialize a python object to a compact JSON string (using orjson if available)
+
+    :param obj: the python object to serialize
+    :return: the JSON string
+    """
+    if orjson is not None:
+        return orjson.dumps(obj).decode()
+    return json.dumps(obj, separators=(',', ':'))
+
+
+def write_json_file(path, obj):
+    """
+    Write a python object to a file as JSON (using orjson if available)
+
+    :param path: the full path of the file
+    :param obj: the python object to write
+    """
+    if orjson is not None:
+        with open(path, 'wb') as outfile:
+            outfile.write(orjson.dumps(obj))
+    else:
+        with open(path, 'w') as outfile:
+            json.dump(obj, outfile, separators=(',', ':'))
 
 
-def walk_depth(directory, max_depth=1):
+def scan_dir(path):
     """
-    Directory tree walk like os.walk(), but with a max_depth limit 
-    :param directory: the directory to start the walk from
-    :param max_depth: the maximum depth to walk
-    :return: the tuple (depth, path, dirs, files)
+    List a directory of the test framework tree. Hidden entries and the output-* directories left behind by previous
+    test runs are skipped.
+    :param path: the full path of the directory
+    :return: the tuple (dirs, files) of a list of the names of the directories and a set of the names of the files
+        in path
     """
-    directory = directory.rstrip(os.path.sep)
-    assert os.path.isdir(directory)
-    base_sep = directory.count(os.path.sep)
-    for path, dirs, files in os.walk(directory):
-        cur_sep = path.count(os.path.sep)
-        depth = cur_sep - base_sep
-        yield depth, path, dirs, files
-        if depth >= max_depth:
-            del dirs[:]
+    dirs, files = [], set()
+    try:
+        it = os.scandir(path)
+        try:
+            for entry in it:
+                if entry.name.startswith(('.', 'output-')):
+                    continue
+                # is_dir() uses the d_type from the directory listing, avoiding a stat() per entry
+                if entry.is_dir():
+                    dirs.append(entry.name)
+                else:
+                    files.add(entry.name)
+        finally:
+            # the iterator only has close() (and context manager support) from Python 3.6; before that it is
+            # closed once exhausted
+            if hasattr(it, 'close'):
+                it.close()
+    except OSError as e:
+        logging.error("Unable to list directory %s, error: %s", path, e)
+    return dirs, files
 
 
 def display_entry(depth, path, dirs, files):
@@ -712,24 +835,24 @@ def display_entry(depth, path, dirs, files):
     :param depth: the depth of this directory within the test framework directory tree 
     :param path: the path to the directory
     :param dirs: a list of the names of directories in path
-    :param files: a list of the names of files in path
+    :param files: a set of the names of files in path
     """
-    logging.debug("depth {}, directory path: {}".format(depth, path))
+    logging.debug("depth %s, directory path: %s", depth, path)
     logging.debug("files in this directory:")
-    for file in files:
-        logging.debug("    {}".format(file))
+    for file in sorted(files):
+        logging.debug("    %s", file)
     logging.debug("subdirectories in this directory:")
     for subdir in dirs:
-        logging.debug("    {}".format(subdir))
+        logging.debug("    %s", subdir)
 
 
-def create_test_results(suite_name, test_name, timestamp, command_args_printable, rc):
+def create_test_results(suite_name, test_name, timestamp_str, command_args_printable, rc):
     """
     Create a minimal test results object for test cases that did not produce their own
 
     :param suite_name: the name of the subdirectory for the suite this test was run in
     :param test_name: the name of the subdirectory for this test case
-    :param timestamp: the timestamp when the test case was run
+    :param timestamp_str: the timestamp when the test case was run, formatted for the results files
     :param command_args_printable: the command line args with sensitive args like password obscured
     :param rc: the return of the test (zero for success, non-zero for fail)
     :return: the results object that can be converted to JSON
@@ -742,7 +865,7 @@ def create_test_results(suite_name, test_name, timestamp, command_args_printable
     results = {
         "ToolName": "Suite: {}, Test case: {}".format(suite_name, test_name),
         "Timestamp": {
-            "DateTime": "{:%Y-%m-%dT%H:%M:%SZ}".format(timestamp)
+            "DateTime": timestamp_str
         },
         "CommandLineArgs": command_args_printable,
         "TestResults": {
@@ -756,57 +879,69 @@ def create_test_results(suite_name, test_name, timestamp, command_args_printable
     return results
 
 
-def get_config_schema(json_file):
+# config filenames, indexed by directory depth
+_CONFIG_FILENAMES = (TestFramework.config_filename, TestSuite.config_filename, TestCase.config_filename)
+
+# schemas for the config files, keyed by config filename
+_CONFIG_SCHEMAS = {config_class.config_filename: config_class.config_schema
+                   for config_class in (TestFramework, TestSuite, TestCase)}
+
+# compiled schema validators for the config files, keyed by config filename (compiled on first use)
+_CONFIG_VALIDATORS = dict()
+
+
+def get_config_validator(json_file):
     """
-    Get and return the schema associated with the given config filename
+    Get and return the schema validator associated with the given config filename, compiling it (which also checks
+    its schema) the first time it is needed
 
     :param json_file: the name of the configuration file
-    :return: the schema
-    """
-    if json_file == TestFramework.config_filename:
-        return TestFramework.config_schema
-    elif json_file == TestSuite.config_filename:
-        return TestSuite.config_schema
-    elif json_file == TestCase.config_filename:
-        return TestCase.config_schema
-    else:
-        logging.error("Unexpected config filename '{}'".format(json_file))
-        return None
+    :return: the validator function (raises fastjsonschema.JsonSchemaValueException if the data is invalid)
+    """
+    validator = _CONFIG_VALIDATORS.get(json_file)
+    if validator is None:
+        if json_file not in _CONFIG_SCHEMAS:
+            logging.error("Unexpected config filename '%s'", json_file)
+            return None
+        import fastjsonschema
+        validator = fastjsonschema.compile(_CONFIG_SCHEMAS[json_file])
+        _CONFIG_VALIDATORS[json_file] = validator
+    return validator
 
 
+@functools.lru_cache(maxsize=None)
 def read_config_file(path, json_file):
     """
-    Read the specified configuration file (in JSON format) and load it into a dictionary
+    Read the specified configuration file (in JSON format) and load it into a dictionary. The result is memoized by
+    path and file name, so callers share the returned dictionary and must not modify it
     
     :param path: the full path of the directory where the configuration file resides
     :param json_file: the configuration file name (not including the path)
     :return: the dictionary representing the JSON config file
     """
+    # fastjsonschema is imported on first use rather than at startup (for its exception classes here)
+    import fastjsonschema
     try:
-        # open JSON config file
-        with open(os.path.join(path, json_file)) as json_data:
-            json_dict = json.load(json_data)
-            # get the schema for the config file and validate it
-            schema = get_config_schema(json_file)
-            jsonschema.validate(json_dict, schema)
+        # read JSON config file
+        json_dict = read_json_file(os.path.join(path, json_file))
+        # get the validator for the config file and validate it
+        validator = get_config_validator(json_file)
+        validator(json_dict)
     except OSError as e:
-        logging.error("OSError opening file {} in directory {}, error: {}"
-                      .format(json_file, path, e))
+        logging.error("OSError opening file %s in directory %s, error: %s", json_file, path, e)
         sys.exit(1)
-    except ValueError as e:
-        logging.error("ValueError loading JSON from file {} in directory {}, error: {}"
-                      .format(json_file, path, e))
+    # the fastjsonschema exceptions are subclasses of ValueError, so they must be handled first
+    except fastjsonschema.JsonSchemaValueException as e:
+        logging.error("JSON validation error from file %s in directory %s, error: %s", json_file, path, e.message)
         sys.exit(1)
-    except jsonschema.ValidationError as e:
-        logging.error("JSON validation error from file {} in directory {}, error: {}"
-                      .format(json_file, path, e.message))
+    except fastjsonschema.JsonSchemaDefinitionException as e:
+        logging.error("JSON schema error from file %s in directory %s, error: %s", json_file, path, e)
         sys.exit(1)
-    except jsonschema.SchemaError as e:
-        logging.error("JSON schema error from file {} in directory {}, error: {}"
-                      .format(json_file, path, e.message))
+    except ValueError as e:
+        logging.error("ValueError loading JSON from file %s in directory %s, error: %s", json_file, path, e)
         sys.exit(1)
     else:
-        logging.info("Successfully read and validated config file {} in directory {}".format(json_file, path))
+        logging.info("Successfully read and validated config file %s in directory %s", json_file, path)
         return json_dict
 
 
@@ -815,20 +950,21 @@ def get_config_file(depth, files):
     Look for the configuration file expected at this depth
     
     :param depth: the directory depth
-    :param files: a list of the names of files in a directory
+    :param files: a set of the names of files in a directory
     :return: the file name of the expected configuration file if present, otherwise None
     """
-    config_files = [TestFramework.config_filename, TestSuite.config_filename, TestCase.config_filename]
-    if config_files[depth] in files:
-        return config_files[depth]
+    config_file = _CONFIG_FILENAMES[depth]
+    if config_file in files:
+        return config_file
     return None
 
 
-def add_test_as_unittest(framework, suite, case, results):
+def add_test_as_unittest(test_methods, framework, suite, case, results):
     """
-    Creates a "test*" method in the RedfishTestCase unittest class for the test case defined by the
+    Creates a "test*" method for the RedfishTestCase unittest class for the test case defined by the
     given framework, suite and case instances.
 
+    :param test_methods: the dictionary of test method names to methods to add the new method to
     :param framework: the TestFramework instance
     :param suite: the TestSuite instance
     :param case: the TestCase instance
@@ -838,52 +974,76 @@ def add_test_as_unittest(framework, suite, case, results):
         self.run_test(framework, suite, case, results)
     test_func_name = 'test_' + suite.get_name() + '_' + case.get_name()
     # ensure test_func_name is a valid python identifier (convert non-valid chars to '_')
-    test_func_name = re.sub('\W|^(?=\d)', '_', test_func_name)
-    setattr(RedfishTestCase, test_func_name, test_func)
+    test_func_name = _SANITIZE_IDENT.sub('_', test_func_name)
     test_func.__name__ = test_func_name
-    logging.debug("Added test {} with name {}".format(test_func, test_func_name))
+    test_methods[test_func_name] = test_func
+    logging.debug("Added test %s with name %s", test_func, test_func_name)
 
 
-def add_details_to_test_case(framework, depth, path, dirs, files):
+def create_test_class(test_methods):
     """
-    Add the configuration data to the TestCase instance associated with this path
-    
-    :param framework: the TestFramework instance
-    :param depth: the current directory depth within the test framework
-    :param path: the full path of this test case subdirectory
-    :param dirs: a list of the names of directories in path
-    :param files: a list of the names of files in path
+    Create the unittest class for this run: a subclass of RedfishTestCase with all of the "test*" methods
+    created by add_test_as_unittest(), built in one step rather than setting them on the class one by one
+
+    :param test_methods: the dictionary of test method names to methods
+    :return: the unittest class
     """
-    _, suite_name, test_name = path.rsplit(os.sep, 2)
-    suite = framework.get_suite(suite_name)
-    test_case = suite.get_test_case(test_name)
-    config_file = get_config_file(depth, files)
-    if config_file is not None:
-        config_dict = read_config_file(path, config_file)
-        test_case.set_config_file(config_file)
-        test_case.set_config_data(config_dict)
+    # reuse the RedfishTestCase name so the tests are reported under the same name
+    return type(RedfishTestCase.__name__, (RedfishTestCase,), test_methods)
+
+
+def load_all_config_data(cases, max_workers=8):
+    """
+    Read the config files of the given test cases in parallel, overlapping the file I/O of the reads. A config
+    file error still exits (the SystemExit from read_config_file() is re-raised here).
+
+    :param cases: a list of the TestCase instances to load
+    :param max_workers: the maximum number of config files to read at the same time
+    """
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for future in [executor.submit(case.load_config_data) for case in cases]:
+            future.result()
+
 
+def run_all(cases, max_workers=os.cpu_count()):
+    """
+    Run the given test cases in parallel. Threads are sufficient since each case blocks in subprocess.call().
+    The results are collected afterwards when the unittest runner calls RedfishTestCase.run_test().
 
-def add_test_cases_to_suite(framework, depth, path, dirs, files):
+    :param cases: a list of the TestCase instances to run
+    :param max_workers: the maximum number of test cases to run at the same time
     """
-    Read the suite config file (if present) and create TestCase instances for each subdirectory in path
-    and add them to the list of test cases for this suite
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for future in [executor.submit(case.run) for case in cases]:
+            future.result()
+
+
+def add_test_cases_to_suite(framework, suite_name, depth, path, dirs, files):
+    """
+    Read the suite config file (if present) and create TestCase instances for each subdirectory in path that
+    contains a test case config file and add them to the list of test cases for this suite
     
     :param framework: the TestFramework instance
+    :param suite_name: the name of this test suite subdirectory
     :param depth: the current directory depth within the test framework
     :param path: the full path of this test suite subdirectory
     :param dirs: a list of the names of directories in path
-    :param files: a list of the names of files in path
+    :param files: a set of the names of files in path
     """
-    _, suite_name = path.rsplit(os.sep, 1)
     suite = framework.get_suite(suite_name)
     config_file = get_config_file(depth, files)
     if config_file is not None:
-        config_dict = read_config_file(path, config_file)
-        suite.set_config_file(config_file)
-        suite.set_config_data(config_dict)
+        suite.set_config(config_file, read_config_file(path, config_file))
+    output_subdir = framework.get_output_subdir()
     for subdir in dirs:
-        test_case = TestCase(path, subdir, framework.get_output_subdir())
+        # only directories with a config file are test cases
+        if not os.path.isfile(os.path.join(path, subdir, TestCase.config_filename)):
+            logging.info("Test case: name = %s skipped, config file (%s) not found, path = %s",
+                         subdir, TestCase.config_filename, os.path.join(path, subdir))
+            continue
+        test_case = TestCase(path, subdir, output_subdir)
+        # the config file is read and validated later for all test cases at once (see load_all_config_data())
+        test_case.set_config_file(TestCase.config_filename)
         suite.add_test_case(test_case)
 
 
@@ -896,24 +1056,38 @@ def add_test_suites(framework, depth, path, dirs, files):
     :param depth: the current directory depth within the test framework
     :param path: the full path of the test framework (top-level) directory
     :param dirs: a list of the names of directories in path
-    :param files: a list of the names of files in path
+    :param files: a set of the names of files in path
     """
     config_file = get_config_file(depth, files)
     if config_file is not None:
-        config_dict = read_config_file(path, config_file)
-        framework.set_config_file(config_file)
-        framework.set_config_data(config_dict)
+        framework.set_config(config_file, read_config_file(path, config_file))
     for subdir in dirs:
         suite = TestSuite(path, subdir)
         framework.add_suite(suite)
 
 
-def main():
-    """
-    main
+# options that take a value, mapped to their destination in the parsed args (must match create_arg_parser())
+_VALUE_OPTIONS = {
+    "-d": "directory", "--directory": "directory",
+    "-r": "rhost", "--rhost": "rhost",
+    "-u": "user", "--user": "user",
+    "-p": "password", "--password": "password",
+    "-i": "interpreter", "--interpreter": "interpreter",
+    "-t": "token", "--token": "token",
+    "-s": "secure", "--secure": "secure",
+    "--scheme": "scheme",
+    "--base_url": "base_url",
+    "-j": "jobs", "--jobs": "jobs"
+}
+
+
+def create_arg_parser():
     """
+    Create the parser for the command-line args
 
-    # Parse command-line args
+    :return: the argparse.ArgumentParser instance
+    """
+    import argparse
     parser = argparse.ArgumentParser(description="Run a collection of Redfish validation tests")
     parser.add_argument("-v", "--verbose", action="count", default=0, help="increase verbosity of output")
     parser.add_argument("-d", "--directory", help="directory containing hierarchy of tests to run")
@@ -927,7 +1101,95 @@ def main():
     parser.add_argument("--scheme",
                         help="scheme for connecting to target host (defaults to https unless --secure is 'Never')")
     parser.add_argument("--base_url", help="target host including the scheme, IP address, and optional :port")
-    cmd_args = parser.parse_args()
+    parser.add_argument("-j", "--jobs", type=int, default=1,
+                        help="number of test cases to run in parallel (default 1; only use for independent tests)")
+    return parser
+
+
+def is_value_option(arg):
+    """
+    Check if a command-line arg is an option that takes a value, including the unambiguous abbreviations of the
+    long options that argparse also accepts (e.g. "--pass" for "--password")
+
+    :param arg: the command-line arg
+    :return: True if the next arg is the value of this option
+    """
+    if arg in _VALUE_OPTIONS:
+        return True
+    # an ambiguous abbreviation is rejected by argparse anyway, so any match is enough to not read the value as a file
+    return arg.startswith("--") and len(arg) > 2 and any(option.startswith(arg) for option in _VALUE_OPTIONS)
+
+
+def expand_arg_files(argv):
+    """
+    Replace each @file arg with the args read from that file (one per line). Only args in the place of an option
+    are expanded, never the value of an option, so values like passwords that start with '@' are passed unchanged.
+
+    :param argv: the command-line args (not including the program name)
+    :return: the command-line args with the @file args expanded
+    """
+    expanded = []
+    index = 0
+    while index < len(argv):
+        arg = argv[index]
+        if is_value_option(arg):
+            expanded.extend(argv[index:index + 2])
+            index += 2
+            continue
+        if arg.startswith("@"):
+            try:
+                with open(arg[1:]) as arg_file:
+                    expanded.extend(expand_arg_files(arg_file.read().splitlines()))
+            except OSError as e:
+                create_arg_parser().error(str(e))
+        else:
+            expanded.append(arg)
+        index += 1
+    return expanded
+
+
+def parse_args_fast(argv):
+    """
+    Parse the common forms of the command-line args ("-v" and "-x value" / "--xx value" options) without argparse.
+    Anything else (help, combined or unknown options, missing or bad values) is left to argparse.
+
+    :param argv: the command-line args (not including the program name)
+    :return: the parsed args, or None if argparse is needed to parse them
+    """
+    args = dict.fromkeys(_VALUE_OPTIONS.values())
+    args["verbose"] = 0
+    args["jobs"] = 1
+    index = 0
+    while index < len(argv):
+        arg = argv[index]
+        if arg in ("-v", "--verbose"):
+            args["verbose"] += 1
+            index += 1
+            continue
+        dest = _VALUE_OPTIONS.get(arg)
+        if dest is None or index + 1 >= len(argv) or argv[index + 1][:1] == "-":
+            return None
+        value = argv[index + 1]
+        if dest == "jobs":
+            try:
+                value = int(value)
+            except ValueError:
+                return None
+        args[dest] = value
+        index += 2
+    return types.SimpleNamespace(**args)
+
+
+def main():
+    """
+    main
+    """
+
+    # Parse command-line args (falling back to argparse for help, errors and the less common forms)
+    argv = expand_arg_files(sys.argv[1:])
+    cmd_args = parse_args_fast(argv)
+    if cmd_args is None:
+        cmd_args = create_arg_parser().parse_args(argv)
 
     # Set up logging
     logging.addLevelName(NOTICE, "NOTICE")
@@ -948,69 +1210,83 @@ def main():
     framework_dir = os.getcwd()
     if cmd_args.directory is not None:
         framework_dir = os.path.abspath(cmd_args.directory)
-    logging.debug("framework_dir = {}".format(framework_dir))
+    logging.debug("framework_dir = %s", framework_dir)
 
-    # Walk the test framework directory tree to a max depth of 2 subdirectories,
+    # Scan the test framework directory tree to a depth of 2 subdirectories,
     # building up the hierarchy of TestFramework, TestSuite(s), and TestCase(s)
-    framework = None
-    for depth, path, dirs, files in walk_depth(framework_dir, 2):
-        display_entry(depth, path, dirs, files)
-        if depth == 0:
-            framework = TestFramework(path)
-            add_test_suites(framework, depth, path, dirs, files)
-        elif depth == 1:
-            add_test_cases_to_suite(framework, depth, path, dirs, files)
-        elif depth == 2:
-            add_details_to_test_case(framework, depth, path, dirs, files)
-        else:
-            logging.error("Invalid depth {}".format(depth))
-            exit(1)
+    if not os.path.isdir(framework_dir):
+        logging.error("Test framework directory %s not found", framework_dir)
+        sys.exit(1)
+    # only display the directory entries when they would be logged
+    display = logging.getLogger().isEnabledFor(logging.DEBUG)
+    dirs, files = scan_dir(framework_dir)
+    if display:
+        display_entry(0, framework_dir, dirs, files)
+    if TestFramework.config_filename not in files:
+        # without the top-level config file there is no test framework to scan
+        logging.error("Top-level config file (%s) not found in %s", TestFramework.config_filename, framework_dir)
+        sys.exit(1)
+    framework = TestFramework(framework_dir)
+    add_test_suites(framework, 0, framework_dir, dirs, files)
+    for suite_name in dirs:
+        suite_path = os.path.join(framework_dir, suite_name)
+        suite_dirs, suite_files = scan_dir(suite_path)
+        if display:
+            display_entry(1, suite_path, suite_dirs, suite_files)
+        add_test_cases_to_suite(framework, suite_name, 1, suite_path, suite_dirs, suite_files)
+        if display:
+            for case in framework.get_suite(suite_name).get_test_cases():
+                case_dirs, case_files = scan_dir(case.get_path())
+                display_entry(2, case.get_path(), case_dirs, case_files)
+
+    # Read the test case config files in parallel
+    load_all_config_data([case for suite in framework.get_suites() for case in suite.get_test_cases()])
 
     # Override params from top-level config file with command-line args
     framework.override_config_data(cmd_args)
 
-    # Create a Results object
-    results = Results(os.path.join(framework.get_path(), "reports", framework.get_output_subdir()),
-                      framework.get_timestamp())
+    # Create a Results object (the HTML reports are written to the same directory)
+    output_subdir = framework.get_output_subdir()
+    reports_dir = os.path.join(framework.get_path(), "reports", output_subdir)
+    results = Results(reports_dir, framework.get_timestamp())
 
     # Traverse the TestFramework hierarchy and execute the specified tests
-    logging.info("Test Framework: config_file = {}, path = {}"
-                 .format(framework.get_config_file(), framework.get_path()))
-    if framework.get_config_file() is None:
-        logging.error("Top-level config file (framework_conf.json) not found")
+    logging.info("Test Framework: config_file = %s, path = %s", framework.get_config_file(), framework.get_path())
+    added_cases = []
+    test_methods = dict()
     suites = framework.get_suites()
     for suite in suites:
+        suite_name = suite.get_name()
         cases = suite.get_test_cases()
         if len(cases) > 0:
-            logging.info("Suite: name = {}, config_file = {}, path = {}"
-                         .format(suite.get_name(), suite.get_config_file(), suite.get_path()))
+            logging.info("Suite: name = %s, config_file = %s, path = %s",
+                         suite_name, suite.get_config_file(), suite.get_path())
         for case in cases:
-            if case.get_config_file() is not None:
-                logging.info("Test case: name = {}, config_file = {}, path = {}"
-                             .format(case.get_name(), case.get_config_file(), case.get_path()))
-                suite.substitute_config_variables(case.get_command_args(), case.get_command_args_printable())
-                framework.substitute_config_variables(case.get_command_args(), case.get_command_args_printable())
-                print("Adding test {}/{} to test runner".format(suite.get_name(), case.get_name()))
-                add_test_as_unittest(framework, suite, case, results)
-            else:
-                logging.info("Test case: name = {} skipped, config file (test_conf.json) not found, path = {}"
-                             .format(case.get_name(), case.get_path()))
-
-    # Run the tests via HTMLTestRunner
-    runner = HtmlTestRunner.HTMLTestRunner(output=os.path.join("reports", framework.get_output_subdir()))
-    runner.run(unittest.makeSuite(RedfishTestCase))
-
-    # Change the directory back to the root of this test framework run
-    try:
-        os.chdir(framework.get_path())
-    except OSError as e:
-        logging.error("Unable to change directory to {}, error: {}".format(framework.get_path(), e))
+            case_name = case.get_name()
+            logging.info("Test case: name = %s, config_file = %s, path = %s",
+                         case_name, case.get_config_file(), case.get_path())
+            substitute_config_variables(framework, suite, case.get_command_args(),
+                                        case.get_command_args_printable())
+            print("Adding test {}/{} to test runner".format(suite_name, case_name))
+            add_test_as_unittest(test_methods, framework, suite, case, results)
+            added_cases.append(case)
+
+    # Optionally run the test cases in parallel up front; the unittest runner then only collects the results
+    if cmd_args.jobs > 1:
+        run_all(added_cases, cmd_args.jobs)
+
+    # Run the tests via HTMLTestRunner (imported here since it is only needed once the tests are set up)
+    import HtmlTestRunner
+    runner = HtmlTestRunner.HTMLTestRunner(output=reports_dir)
+    # build the suite from the known test names (sorted, the order unittest's loader would use)
+    test_class = create_test_class(test_methods)
+    runner.run(unittest.TestSuite(test_class(name) for name in sorted(test_methods)))
 
     # Write results summary
     results.write_results()
 
     print()
-    print("See HTML and JSON summary results in {}/{}/".format("reports", framework.get_output_subdir()))
+    print("See HTML and JSON summary results in reports/{}/".format(output_subdir))
     print()
 
 